@@ -1,20 +1,29 @@
 import argparse
 from dataclasses import dataclass
+import functools
+import hashlib
 import json
 import logging
+import logging.handlers
 import os
-from datetime import date, datetime
-from typing import List
+import pickle
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Tuple
 
 import arxiv
 from arxivql.taxonomy import categories_by_id
 from arxivql import Query, Taxonomy as T
 
 
-# Load configuration
+SCRIPT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+
+
+# Load configuration (cached, use load_config.cache_clear() to reload)
+@functools.lru_cache(maxsize=1)
 def load_config():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(script_dir, "config.json")
+    config_path = os.path.join(SCRIPT_DIR, "config.json")
     with open(config_path, "r") as f:
         return json.load(f)
 
@@ -22,24 +31,43 @@ def load_config():
 config = load_config()
 
 # Use environment variable if set, otherwise use config file
-BASE_DIR: str = os.environ.get(
-    "ARXIV_SEARCHER_BASE_DIR", os.path.dirname(os.path.abspath(__file__))
-)
+BASE_DIR: str = os.environ.get("ARXIV_SEARCHER_BASE_DIR", SCRIPT_DIR)
 
 # Setup paths
 LOG_DIR = os.path.join(BASE_DIR, config["log_dir"])
 
-# Setup logging
+# Setup logging, rotated daily at midnight keeping the last 30 days
 logging.basicConfig(
-    filename=os.path.join(
-        LOG_DIR, f"arxiv_searcher_{datetime.now().strftime('%Y%m%d')}.log"
-    ),
+    handlers=[
+        logging.handlers.TimedRotatingFileHandler(
+            os.path.join(LOG_DIR, "arxiv_searcher.log"), when="midnight", backupCount=30
+        )
+    ],
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
 MAXIMUM_KEYWORDS_ALLOWED = 12
 
+# Every 100 results costs one extra page request plus the client's 3s delay
+DEFAULT_MAX_RESULTS = 200
+
+# Persistent search results cache, shared across processes and sessions
+CACHE_DIR: str = os.environ.get(
+    "ARXIV_SEARCHER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "arxiv_searcher")
+)
+# Results for recent date ranges may still change, older ones are kept forever
+CACHE_TTL = timedelta(hours=24)
+CACHE_IMMUTABLE_AFTER = timedelta(days=7)
+# Bump whenever the pickled shape of Paper changes, so old entries are never loaded
+CACHE_VERSION = 2
+# Expired and outdated entries are deleted when read. Beyond this many entries, the
+# least recently used ones (oldest mtime, refreshed on every hit) are deleted on write
+CACHE_MAX_ENTRIES = 1000
+
+# Shared client so consecutive searches and result pages reuse its HTTP session (keep-alive)
+_CLIENT = arxiv.Client(page_size=100, delay_seconds=3, num_retries=3)
+
 # All categories available in arxiv
 # Link https://arxiv.org/category_taxonomy
 ARXIV_CATEGORIES = {
@@ -57,19 +85,24 @@ ARXIV_CATEGORIES = {
     "Economics": T.econ
 }
 
+CATEGORY_NAMES = tuple(ARXIV_CATEGORIES)
+
+# Category filters never change, so build each one once
+_CATEGORY_QUERIES = {name: Query.category(subcategories) for name, subcategories in ARXIV_CATEGORIES.items()}
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Paper:
     arxiv_id: str
     title: str
-    authors: List[str] 
+    authors: Tuple[str, ...]
     abstract: str
     published: datetime
     updated: datetime
     link: str
     pdf_link: str
     main_category: str
-    categories: List[str]
+    categories: Tuple[str, ...]
 
 
 def build_arxiv_query(keywords: List[str], category: str = "cs") -> Query:
@@ -81,15 +114,17 @@ def build_arxiv_query(keywords: List[str], category: str = "cs") -> Query:
         category (str): High-level arXiv category key mapped to multiple subcategories.
     """
     
-    if category not in ARXIV_CATEGORIES.keys():
-        raise ValueError(f"Invalid arxiv category. Categories available: {ARXIV_CATEGORIES.keys()}") 
+    if category not in ARXIV_CATEGORIES:
+        raise ValueError(f"Invalid arxiv category. Categories available: {CATEGORY_NAMES}")
 
     # Each keyword must be in title OR abstract
     keyword_query = None
+    seen = set()
     for kw in keywords:
         kw = kw.strip()
-        if not kw:
+        if not kw or kw.casefold() in seen:
             continue
+        seen.add(kw.casefold())
         # (ti:kw OR abs:kw)
         clause = Query.title(kw) | Query.abstract(kw)
         if keyword_query is None:
@@ -98,12 +133,119 @@ def build_arxiv_query(keywords: List[str], category: str = "cs") -> Query:
             keyword_query &= clause
     
     # Categories: search in any of the mapped subcategories (OR)
-    subcategories = ARXIV_CATEGORIES[category]
-    category_query = Query.category(subcategories)
-    return category_query & keyword_query
+    return _CATEGORY_QUERIES[category] & keyword_query
 
 
-def search(keywords: str, start_date: datetime.date, end_date: datetime.date, sort_by: str, category: str) -> List[Paper]:
+def _cache_path(
+    keywords: List[str], start_date: date, end_date: date, sort_by: str, category: str, max_results: int
+) -> str:
+    """
+    Build the cache file path for a search. Keywords are case-folded and sorted
+    so equivalent queries share the same entry.
+    """
+    key = (
+        CACHE_VERSION,
+        tuple(sorted(kw.lower() for kw in keywords if kw)),
+        start_date.isoformat(),
+        end_date.isoformat(),
+        sort_by,
+        category,
+        max_results,
+    )
+    digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.pkl")
+
+
+def _remove_cached(path: str) -> None:
+    """Delete a cache entry, ignoring entries already removed by another process."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _prune_cache() -> None:
+    """Delete the least recently used entries above CACHE_MAX_ENTRIES."""
+    entries = []
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".pkl"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    pass
+
+    if len(entries) <= CACHE_MAX_ENTRIES:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - CACHE_MAX_ENTRIES]:
+        _remove_cached(path)
+
+
+def _load_cached(path: str) -> List[Paper] | None:
+    """
+    Return cached papers stored at path, or None if missing or expired.
+    Expired, unreadable and outdated entries are deleted.
+    """
+    try:
+        with open(path, "rb") as f:
+            version, expires_at, papers = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning("Ignoring unreadable cache entry %s: %s", path, e)
+        _remove_cached(path)
+        return None
+
+    if version != CACHE_VERSION or not isinstance(papers, list) or not all(isinstance(p, Paper) for p in papers):
+        logging.warning("Ignoring cache entry %s written in an outdated format", path)
+        _remove_cached(path)
+        return None
+    if expires_at is not None and expires_at < time.time():
+        _remove_cached(path)
+        return None
+
+    # Mark the entry as recently used for pruning
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return papers
+
+
+def _store_cached(path: str, papers: List[Paper], end_date: date) -> None:
+    """
+    Persist papers at path. Entries for old date ranges never expire.
+    Empty results are not stored, they may come from a transient arXiv failure.
+    """
+    if not papers:
+        return
+
+    if end_date < date.today() - CACHE_IMMUTABLE_AFTER:
+        expires_at = None
+    else:
+        expires_at = time.time() + CACHE_TTL.total_seconds()
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((CACHE_VERSION, expires_at, papers), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        _prune_cache()
+    except Exception as e:
+        logging.warning("Could not write cache entry %s: %s", path, e)
+
+
+def search(
+    keywords: str,
+    start_date: datetime.date,
+    end_date: datetime.date,
+    sort_by: str,
+    category: str,
+    max_results: int = DEFAULT_MAX_RESULTS,
+) -> List[Paper]:
     """
     Search arXiv for papers matching the specified criteria.
 
@@ -113,6 +255,7 @@ def search(keywords: str, start_date: datetime.date, end_date: datetime.date, so
         end_date (datetime.date): End date.
         sort_by (str): Sorting method, either 'relevance' or 'submitted'.
         category (str): Specific research category
+        max_results (int): Maximum number of papers to fetch from arXiv.
     """
     logging.info("Querying arXiv for papers.")
 
@@ -123,47 +266,73 @@ def search(keywords: str, start_date: datetime.date, end_date: datetime.date, so
         raise ValueError("At least one keyword must be provided")
 
     keywords = [item.strip() for item in keywords.split(",")]
+    # Drop empty and repeated keywords (case-insensitive), keeping first-seen order
+    unique_keywords = {}
+    for kw in keywords:
+        if kw:
+            unique_keywords.setdefault(kw.casefold(), kw)
+    keywords = list(unique_keywords.values())
     if len(keywords) > MAXIMUM_KEYWORDS_ALLOWED:
         raise ValueError(f"Too many keywords provided ({len(keywords)}). Maximum allowed is {MAXIMUM_KEYWORDS_ALLOWED}.")
 
-    client = arxiv.Client()
+    cache_path = _cache_path(keywords, start_date, end_date, sort_by, category, max_results)
+    cached = _load_cached(cache_path)
+    if cached is not None:
+        logging.info("Cache hit for keywords: %s", keywords)
+        return cached
+
     query = build_arxiv_query(keywords=keywords, category=category)
 
     # Add date filtering
     query &= Query.submitted_date(start_date, end_date)
 
-    logging.info(f"Keywords for filtering: {keywords}")
-    logging.info(f"Date Range: {start_date} - {end_date}")
-    logging.info(f"Query being used: {query}\n")
-    print(f"Query being used: {query}\n")
+    query_str = str(query)
+
+    logging.info("Keywords for filtering: %s", keywords)
+    logging.info("Date Range: %s - %s", start_date, end_date)
+    logging.info("Query being used: %s\n", query_str)
 
     search = arxiv.Search(
-        query=str(query), 
-        max_results=1000, 
+        query=query_str,
+        max_results=max_results,
         sort_by=arxiv.SortCriterion.Relevance if sort_by == "relevance" else arxiv.SortCriterion.SubmittedDate
     )
 
+    papers = []
+    # arXiv may return the same paper on more than one page
+    seen_ids = set()
+    # Local names avoid repeated global lookups inside the results loop
+    category_by_id = categories_by_id
+    add_paper = papers.append
     try:
-        return [
-            Paper(
-                arxiv_id=result.get_short_id(),
-                title=result.title,
-                authors=[a.name for a in result.authors],
-                abstract=result.summary,
-                published=result.published,
-                updated=result.updated,
-                link=result.entry_id,
-                pdf_link=result.pdf_url,
-                main_category=categories_by_id[result.primary_category].name,
-                # Uses arxivql api to get the category name
-                categories=[categories_by_id[cat].name for cat in result.categories]
+        for result in _CLIENT.results(search):
+            arxiv_id = result.get_short_id()
+            if arxiv_id in seen_ids:
+                continue
+            seen_ids.add(arxiv_id)
+
+            add_paper(
+                Paper(
+                    arxiv_id=arxiv_id,
+                    title=result.title,
+                    authors=tuple([a.name for a in result.authors]),
+                    abstract=result.summary,
+                    published=result.published,
+                    updated=result.updated,
+                    link=result.entry_id,
+                    pdf_link=result.pdf_url,
+                    main_category=category_by_id[result.primary_category].name,
+                    # Uses arxivql api to get the category name
+                    categories=tuple([category_by_id[cat].name for cat in result.categories])
+                )
             )
-            for result in client.results(search)
-        ]
     except Exception as e:
         logging.error("Error getting results: %s", e)
         raise Exception("Error fetching papers")
 
+    _store_cached(cache_path, papers, end_date)
+    return papers
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Test local arXiv search extraction.")
@@ -178,7 +347,7 @@ if __name__ == "__main__":
     parser.add_argument(
         "--category",
         type=str,
-        choices=ARXIV_CATEGORIES.keys(),
+        choices=CATEGORY_NAMES,
         help="ArXiv categories",
     )
 
@@ -204,6 +373,13 @@ if __name__ == "__main__":
         help="Sorting method for arXiv results.",
     )
 
+    parser.add_argument(
+        "--max_results",
+        type=int,
+        default=DEFAULT_MAX_RESULTS,
+        help="Maximum number of papers to fetch from arXiv.",
+    )
+
     args = parser.parse_args()
 
     end_date = args.end_date if args.end_date is not None else str(date.today())
@@ -213,7 +389,8 @@ if __name__ == "__main__":
         start_date=datetime.strptime(args.start_date, "%Y-%m-%d").date(),
         end_date=datetime.strptime(end_date, "%Y-%m-%d").date(),
         sort_by=args.sort_by,
-        category=args.category
+        category=args.category,
+        max_results=args.max_results,
     )
 
     for i in range(len(results)):
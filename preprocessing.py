@@ -1,58 +1,91 @@
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import List
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import normalize
-from sklearn.decomposition import PCA
+from sklearn.decomposition import TruncatedSVD
 from arxiv_searcher import Paper
 
 
-__vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
+# Recently vectorized document sets: digest -> (normalized matrix, feature names).
+# Shared by every Streamlit session, hence the lock.
+VECTORIZE_CACHE_SIZE = 8
+__vectorize_cache = OrderedDict()
+__vectorize_cache_lock = threading.Lock()
+
 
 def preprocess_and_vectorize(papers: List[Paper]):
     """
     Extracts text from papers and vectorizes them using TF-IDF.
-    Returns the vector matrix.
+    Returns a tuple of (vector matrix, feature names), the feature names map matrix
+    columns back to words. The same set of papers is only fitted once.
     """
     if not papers:
-        return None
+        return None, None
     
-    documents = [f"{p.title} {p.abstract}" for p in papers]
+    # Documents are streamed from papers to avoid materializing all strings at once
+    hasher = hashlib.blake2b(digest_size=16)
+    for p in papers:
+        hasher.update(f"{p.title} {p.abstract}\n".encode("utf-8"))
+    key = hasher.digest()
+
+    with __vectorize_cache_lock:
+        cached = __vectorize_cache.get(key)
+        if cached is not None:
+            __vectorize_cache.move_to_end(key)
+            return cached
+
+    vectorizer = TfidfVectorizer(stop_words='english', max_features=1000, dtype=np.float32)
     # Normalizing make its use cosine distance instead of euclidean distance
-    return normalize(__vectorizer.fit_transform(documents), norm='l2')
+    X = normalize(vectorizer.fit_transform(f"{p.title} {p.abstract}" for p in papers), norm='l2')
+    result = (X, vectorizer.get_feature_names_out())
+
+    with __vectorize_cache_lock:
+        __vectorize_cache[key] = result
+        if len(__vectorize_cache) > VECTORIZE_CACHE_SIZE:
+            __vectorize_cache.popitem(last=False)
 
+    return result
 
-def get_top_k_words(centroids, top_k=3):
+
+def get_top_k_words(centroids, terms, top_k=3):
     """
     Returns the top k words for each cluster based on centroid values.
     
     Args:
         centroids: Cluster centroids from KMeans (shape: n_clusters x n_features)
+        terms: Feature names returned by preprocess_and_vectorize for the same papers
         top_k: Number of top words to extract per cluster
     
     Returns:
         Dictionary mapping cluster_id -> list of top k words
     """
-    top_words = {}
-    terms = __vectorizer.get_feature_names_out()
-    
-    for i in range(len(centroids)):
-        # Get indices of top k features (words) with highest values in this centroid
-        top_indices = centroids[i].argsort()[-top_k:][::-1]
-        top_words[i] = [terms[idx] for idx in top_indices]
-    
-    return top_words
+    centroids = np.asarray(centroids)
+    top_k = min(top_k, centroids.shape[1])
+
+    # Select the k highest-valued features (words) of every centroid without a full sort,
+    # then order just those k by value
+    top_indices = np.argpartition(-centroids, top_k - 1, axis=1)[:, :top_k]
+    rows = np.arange(centroids.shape[0])[:, None]
+    top_indices = top_indices[rows, np.argsort(-centroids[rows, top_indices], axis=1)]
+
+    return {i: terms[top_indices[i]].tolist() for i in range(centroids.shape[0])}
 
 
 def get_2d_coordinates(X):
     """
-    Reduces the dimensions of the vector matrix X to 2 components using PCA.
+    Reduces the dimensions of the vector matrix X to 2 components using TruncatedSVD.
+    Works on the sparse matrix directly; for L2-normalized TF-IDF this matches PCA
+    up to mean-centering, which doesn't matter for a 2D visualization.
     """
     if X is None:
         return None
     
-    # We need at least 2 samples/features for 2 components, but PCA handles it mostly. 
-    # If samples < 2, it might error or return less components.
-    if X.shape[0] < 2:
+    # TruncatedSVD needs more features than components and at least 2 samples
+    if X.shape[0] < 2 or X.shape[1] <= 2:
         return None
 
-    pca = PCA(n_components=2, random_state=42)
-    return pca.fit_transform(X.toarray())
+    svd = TruncatedSVD(n_components=2, algorithm="randomized", n_iter=5, random_state=42)
+    return svd.fit_transform(X)
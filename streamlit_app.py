@@ -1,25 +1,37 @@
+import os
+
+# Clustering runs on a few hundred papers at most, where OpenMP/BLAS thread startup
+# costs more than it saves. Must be set before numpy/sklearn are imported.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
 import logging
 from pathlib import Path
-from typing import List
+from typing import List, Literal, Tuple
 import streamlit as st
 from datetime import date, timedelta
 
-from arxiv_searcher import Paper, search, ARXIV_CATEGORIES
+from arxiv_searcher import Paper, search, CATEGORY_NAMES, DEFAULT_MAX_RESULTS
 from preprocessing import preprocess_and_vectorize, get_top_k_words
 from sklearn.cluster import KMeans
 import numpy as np
-import plotly.express as px
-import pandas as pd
+import plotly.graph_objects as go
 
 st.set_page_config(
     page_title="Paper Explorer", page_icon="📚", layout="centered"
 )
 
 
-def load_css(file_path: str):
+@st.cache_data(show_spinner=False)
+def _read_css(file_path: str, mtime: float) -> str:
+    """Read CSS once per file version; mtime is only part of the cache key."""
+    return Path(file_path).read_text()
+
+
+def load_css(file_path: Path):
     """Load CSS from external file."""
-    with open(file_path) as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+    css = _read_css(str(file_path), file_path.stat().st_mtime)
+    st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
 
 
 css_path = Path(__file__).parent / "styles.css"
@@ -32,20 +44,32 @@ st.markdown(
 )
 
 
+def normalize_keywords(keywords: str) -> Tuple[str, ...]:
+    """Splits, lowercases, deduplicates and sorts keywords so equivalent inputs share a cache entry."""
+    return tuple(sorted({kw.strip().lower() for kw in keywords.split(",") if kw.strip()}))
+
+
 @st.cache_data(ttl=timedelta(hours=1), max_entries=1000, show_spinner=False)
 def search_papers(
-    keywords: str, start_date: date, end_date: date, sort_opt: str, category_option: str
+    keywords: Tuple[str, ...],
+    start_date: date,
+    end_date: date,
+    sort_opt: Literal["relevance", "submitted"],
+    category_option: str,
+    max_results: int = DEFAULT_MAX_RESULTS,
 ) -> List[Paper]:
     return search(
-        keywords=keywords,
+        keywords=", ".join(keywords),
         start_date=start_date,
         end_date=end_date,
         sort_by=sort_opt,
         category=category_option,
+        max_results=max_results,
     )
 
 
-@st.cache_resource(show_spinner=False)
+# The versioned arXiv id identifies a paper, no need to hash titles and abstracts
+@st.cache_resource(show_spinner=False, hash_funcs={Paper: lambda p: p.arxiv_id})
 def get_paper_clusters(papers: List[Paper], n_clusters: int = 1):
     """
     Perform clustering on a list of papers.
@@ -62,21 +86,30 @@ def get_paper_clusters(papers: List[Paper], n_clusters: int = 1):
         n_clusters = 10
 
     try:
-        X = preprocess_and_vectorize(papers)
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        X, terms = preprocess_and_vectorize(papers)
+        # k-means++ seeding is good enough for a single init on these small problems.
+        # Elkan is undefined for a single cluster, sklearn would warn and use lloyd anyway
+        kmeans = KMeans(
+            n_clusters=n_clusters,
+            n_init=1,
+            algorithm="elkan" if n_clusters > 1 else "lloyd",
+            max_iter=50,
+            random_state=42,
+        )
         kmeans.fit(X)
         labels = kmeans.labels_
-        top_clusters_words = get_top_k_words(kmeans.cluster_centers_, top_k=3)
-        clusters = {}
-        for idx, label in enumerate(labels):
-            label_int = int(label)
-            if label_int not in clusters:
-                clusters[label_int] = []
-            clusters[label_int].append(papers[idx])
-        
-        # Sort clusters by label keys to ensure consistent order
-        sorted_clusters = dict(sorted(clusters.items()))
-        return sorted_clusters, top_clusters_words
+        top_clusters_words = get_top_k_words(kmeans.cluster_centers_, terms, top_k=3)
+
+        # Group paper indices by label: a stable sort keeps the original paper order inside
+        # each cluster and yields the clusters sorted by label for a consistent order
+        order = np.argsort(labels, kind="stable")
+        sorted_labels = labels[order]
+        boundaries = np.flatnonzero(np.diff(sorted_labels)) + 1
+        clusters = {
+            int(labels[group[0]]): [papers[idx] for idx in group]
+            for group in np.split(order, boundaries)
+        }
+        return clusters, top_clusters_words
     except Exception as e:
         # Log error in console but return a fallback
         print(f"Clustering error: {e}")
@@ -84,39 +117,90 @@ def get_paper_clusters(papers: List[Paper], n_clusters: int = 1):
         return {0: papers}, {}
 
 
-def create_cluster_viz(ordered_papers: List[Paper], all_labels: List[str]):
-    # Use Year and Cluster for visualization
+def get_cluster_viz_coords(ordered_papers: List[Paper], all_labels: List[str]) -> np.ndarray:
+    """
+    Computes (x, y) plot positions for every paper. Only called while the plot is shown.
+    Uses Year and Cluster, with jitter to avoid overlapping points since both axes are discrete.
+    """
     years = [p.published.year for p in ordered_papers]
     cluster_nums = [int(label) for label in all_labels]
-    
-    # Add jitter to avoid overlapping points since both axes are discrete
-    np.random.seed(42)
-    jitter_x = np.random.uniform(-0.3, 0.3, size=len(ordered_papers))
-    jitter_y = np.random.uniform(-0.3, 0.3, size=len(ordered_papers))
-
-    df_viz = pd.DataFrame({
-        "Year": years,
-        "Cluster": [f"Cluster {label}" for label in all_labels],
-        "x": np.array(years) + jitter_x,
-        "y": np.array(cluster_nums) + jitter_y,
-        "Title": [p.title for p in ordered_papers],
-        "Date": [p.published.strftime("%Y-%m-%d") for p in ordered_papers]
-    })
-    
-    fig = px.scatter(
-        df_viz, 
-        x="x", y="y", 
-        color="Cluster", 
-        hover_data={
-            "Title": True, 
-            "Date": True,
-            "Cluster": True,
-            "x": False, 
-            "y": False
-        },
-        title="Paper Clusters"
+
+    rng = np.random.default_rng(42)
+    jitter = rng.uniform(-0.3, 0.3, size=(len(years), 2))
+    return np.column_stack((years, cluster_nums)) + jitter
+
+
+def flatten_clusters(clusters: dict):
+    """
+    Flattens clusters into the order used by the visualization.
+    Returns a tuple of (ordered_papers, all_labels).
+    """
+    ordered_papers = [p for p_list in clusters.values() for p in p_list]
+    all_labels = [str(label) for label, p_list in clusters.items() for _ in p_list]
+    return ordered_papers, all_labels
+
+
+# Static HTML around the secondary categories of a paper card
+OTHER_CATEGORY_PREFIX = '<div class="paper-other-categories">'
+OTHER_CATEGORY_SUFFIX = "</div>"
+OTHER_CATEGORY_SEPARATOR = OTHER_CATEGORY_SUFFIX + OTHER_CATEGORY_PREFIX
+
+
+def render_paper(paper: Paper) -> str:
+    """Builds the HTML of a paper card followed by its collapsible details."""
+    paper_date = paper.published.strftime("%d/%m/%Y")
+    other_cats = paper.categories[1:]
+    other_cats_html = (
+        OTHER_CATEGORY_PREFIX + OTHER_CATEGORY_SEPARATOR.join(other_cats) + OTHER_CATEGORY_SUFFIX if other_cats else ""
     )
-    
+    authors_str = ", ".join(paper.authors)
+    # A blank line would end the HTML block in markdown
+    abstract = paper.abstract.replace("\n", " ")
+
+    return f"""
+<div class="paper-card">
+<div class="paper-title">{paper.title}</div>
+<div class="paper-categories">
+<div class="paper-main-category tooltip">{paper.main_category}<span class="tooltiptext">Primary Category</span></div>{other_cats_html}
+</div>
+<div class="paper-metadata">
+<span class="metadata-item">📅 {paper_date}</span>
+<span class="metadata-item">🔗 <a href="{paper.link}">View on arXiv</a></span>
+</div>
+</div>
+<details class="paper-details">
+<summary>View details</summary>
+<div class='paper-authors'><strong>Authors:</strong> {authors_str}</div>
+[📄 <a href='{paper.pdf_link}'>PDF</a>]
+<div class='paper-abstract'><strong>Abstract</strong><br>{abstract}</div>
+</details>
+"""
+
+
+def build_cluster_fig(coords: np.ndarray, titles: List[str], dates: List[str], labels: List[str]):
+    """Builds the cluster scatter plot."""
+    cluster_ids = sorted({int(label) for label in labels})
+
+    labels = np.asarray(labels)
+    titles = np.asarray(titles)
+    dates = np.asarray(dates)
+
+    # One WebGL trace per cluster, so each cluster gets its own color and legend entry
+    fig = go.Figure()
+    for cluster_id in cluster_ids:
+        mask = labels == str(cluster_id)
+        fig.add_trace(
+            go.Scattergl(
+                x=coords[mask, 0],
+                y=coords[mask, 1],
+                mode="markers",
+                name=f"Cluster {cluster_id}",
+                customdata=np.column_stack((titles[mask], dates[mask])),
+                hovertemplate="Title=%{customdata[0]}<br>Date=%{customdata[1]}<extra>%{fullData.name}</extra>",
+            )
+        )
+    fig.update_layout(title="Paper Clusters", legend_title_text="Cluster")
+
     # Format axes to show original categories (Years and Cluster IDs)
     fig.update_layout(
         xaxis=dict(
@@ -129,8 +213,8 @@ def create_cluster_viz(ordered_papers: List[Paper], all_labels: List[str]):
         yaxis=dict(
             title="Cluster ID",
             tickmode='array',
-            tickvals=list(range(len(clusters))),
-            ticktext=[f"Cluster {i}" for i in range(len(clusters))],
+            tickvals=cluster_ids,
+            ticktext=[f"Cluster {i}" for i in cluster_ids],
             showgrid=True,
             gridcolor='rgba(200, 200, 200, 0.2)'
         ),
@@ -138,6 +222,16 @@ def create_cluster_viz(ordered_papers: List[Paper], all_labels: List[str]):
         hovermode="closest"
     )
 
+    return fig
+
+
+def create_cluster_viz(ordered_papers: List[Paper], all_labels: List[str]):
+    fig = build_cluster_fig(
+        get_cluster_viz_coords(ordered_papers, all_labels),
+        [p.title for p in ordered_papers],
+        [p.published.strftime("%Y-%m-%d") for p in ordered_papers],
+        all_labels,
+    )
     return st.plotly_chart(fig, height=500)
 
 
@@ -147,12 +241,13 @@ ORDER_BY_OPTIONS = {
     "Relevance": "relevance",
     "Submitted Date": "submitted",
 }
+ORDER_BY_NAMES = tuple(ORDER_BY_OPTIONS)
 
 DEFAULT_KEYWORDS = "large language models, multi-agent systems"
 
 # Initialize session state
 if "search_results" not in st.session_state:
-    st.session_state["search_results"] = {"papers": [], "searched": False, "clusters": {}, "top_words": {}}
+    st.session_state["search_results"] = {"papers": [], "searched": False, "clusters": {}, "top_words": {}, "ordered": ([], [])}
 
 st.title("Paper Discovery", anchor=False)
 
@@ -177,28 +272,31 @@ with col_keywords:
 with col_category:
     category_option = st.selectbox(
         "Category",
-        ARXIV_CATEGORIES.keys(),
+        CATEGORY_NAMES,
         index=0,
         help="Focus your search on a specific research field",
     )
 
+# Default -> Starts from last year (Feb 29 falls back to Mar 1)
+today = date.today()
+try:
+    default_start_date = today.replace(year=today.year - 1)
+except ValueError:
+    default_start_date = date(today.year - 1, 3, 1)
+
 col_start_date, col_end_date, col_order_by, col_search_bt = st.columns(
     [1, 1, 1.5, 1], vertical_alignment="center"
 )
 
 with col_start_date:
-    # Default -> Starts from last year
-    start_date = st.date_input(
-        "Start Date",
-        value=date(date.today().year - 1, date.today().month, date.today().day),
-    )
+    start_date = st.date_input("Start Date", value=default_start_date)
 
 with col_end_date:
     end_date = st.date_input("End Date", value="today")
 
 with col_order_by:
     sort_option = st.selectbox(
-        "Order By", ORDER_BY_OPTIONS.keys(), help="Order applied to arXiv search"
+        "Order By", ORDER_BY_NAMES, help="Order applied to arXiv search"
     )
 
 with col_search_bt:
@@ -215,10 +313,10 @@ if search_button:
                 keywords = DEFAULT_KEYWORDS
 
             papers = search_papers(
-                keywords=keywords,
+                keywords=normalize_keywords(keywords),
                 start_date=start_date,
                 end_date=end_date,
-                sort_opt=sort_option.lower(),
+                sort_opt=ORDER_BY_OPTIONS[sort_option],
                 category_option=category_option,
             )
 
@@ -228,6 +326,7 @@ if search_button:
                 clusters, top_words = get_paper_clusters(papers)
                 st.session_state["search_results"]["clusters"] = clusters
                 st.session_state["search_results"]["top_words"] = top_words
+                st.session_state["search_results"]["ordered"] = flatten_clusters(clusters)
 
             st.session_state["search_results"]["searched"] = True
         except Exception as e:
@@ -249,6 +348,7 @@ if st.session_state["search_results"]["searched"] and st.session_state["search_r
     # Show each paper
     clusters = st.session_state["search_results"].get("clusters")
     top_words = st.session_state["search_results"].get("top_words", {})
+    ordered_papers, all_labels = st.session_state["search_results"].get("ordered", ([], []))
 
     col_toggle, col_slider, col_button = st.columns([1.5, 2, 1], vertical_alignment="center")
     with col_toggle:
@@ -267,19 +367,13 @@ if st.session_state["search_results"]["searched"] and st.session_state["search_r
             cluster_button = st.button("Cluster")
             if cluster_button:
                 clusters, top_words = get_paper_clusters(st.session_state['search_results']['papers'], n_clusters)
+                ordered_papers, all_labels = flatten_clusters(clusters)
                 st.session_state["search_results"]["clusters"] = clusters
                 st.session_state["search_results"]["top_words"] = top_words
+                st.session_state["search_results"]["ordered"] = (ordered_papers, all_labels)
  
         if len(st.session_state['search_results']['papers']) >= MIN_PAPERS_FOR_CLUSTERING:
             try:
-                # Flatten the clusters to match the dataframe indices
-                ordered_papers = []
-                all_labels = []
-                for label, p_list in clusters.items():
-                    for p in p_list:
-                        ordered_papers.append(p)
-                        all_labels.append(str(label))
-
                 create_cluster_viz(ordered_papers, all_labels)
             except Exception as e:
                 st.warning("Visualization failed")
@@ -288,41 +382,17 @@ if st.session_state["search_results"]["searched"] and st.session_state["search_r
             st.info("Not enough papers to visualize clusters.")
 
     # Show papers by cluster
-    tabs = st.tabs([f"Cluster {k}" for k in clusters.keys()])
+    cluster_ids = tuple(clusters.keys())
+    tabs = st.tabs([f"Cluster {k}" for k in cluster_ids])
 
     for i, tab in enumerate(tabs):
+        cluster_id = cluster_ids[i]
         with tab:
             if len(st.session_state['search_results']['papers']) >= MIN_PAPERS_FOR_CLUSTERING:
-                st.markdown(f"<div class='results-count'>{len(clusters[i])} Papers in the cluster | Key terms: {', '.join(top_words[i])}</div>", unsafe_allow_html=True)
-
-            for paper in clusters[i]:
-                paper_date = paper.published.strftime("%d/%m/%Y")
-                other_cats_html = "".join(f'<div class="paper-other-categories">{cat}</div>' for cat in paper.categories[1:])
-
-                paper_html = f"""
-                <div class="paper-card">
-                    <div class="paper-title">{paper.title}</div>
-                    <div class="paper-categories">
-                        <div class="paper-main-category tooltip">{paper.main_category}<span class="tooltiptext">Primary Category</span></div>{other_cats_html}
-                    </div>
-                    <div class="paper-metadata">
-                        <span class="metadata-item">📅 {paper_date}</span>
-                        <span class="metadata-item">🔗 <a href="{paper.link}">View on arXiv</a></span>
-                    </div>
-                </div>
-                """
-                st.markdown(paper_html, unsafe_allow_html=True)
-
-                with st.expander("View details"):
-                    authors_str = ", ".join(paper.authors)
-                    st.markdown(
-                        f"""
-                        <div class='paper-authors'><strong>Authors:</strong> {authors_str}</div>
-                        [📄 <a href='{paper.pdf_link}'>PDF</a>]
-                        <div class='paper-abstract'><strong>Abstract</strong><br>{paper.abstract}</div>
-                    """,
-                        unsafe_allow_html=True,
-                    )
+                st.markdown(f"<div class='results-count'>{len(clusters[cluster_id])} Papers in the cluster | Key terms: {', '.join(top_words[cluster_id])}</div>", unsafe_allow_html=True)
+
+            # One markdown element per tab instead of a card and an expander per paper
+            st.markdown("".join([render_paper(paper) for paper in clusters[cluster_id]]), unsafe_allow_html=True)
 
 # Empty state
 elif st.session_state["search_results"]["searched"] and not st.session_state["search_results"]["papers"]: